@@ -1,26 +1,67 @@
-from sentence_transformers import SentenceTransformer
 import os
-import ast
+
+# Size the OpenMP/BLAS thread pools before numpy, torch and faiss create them. Explicit environment
+# settings win, e.g. OMP_NUM_THREADS=1 when scaling out with several uvicorn workers instead.
+_available_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, str(_available_cpus or 1))
+# Idle OpenMP workers sleep instead of spinning, so they don't steal CPU from the event loop
+os.environ.setdefault("OMP_WAIT_POLICY", "PASSIVE")
+# Run Numba parallel kernels only on the OpenMP runtime. Its TBB layer can hang when a kernel is first
+# launched from a worker thread, which is how mapping runs (asyncio.to_thread), and the workqueue
+# layer is not thread-safe. The fused kernel is disabled if OpenMP is unavailable.
+os.environ.setdefault("NUMBA_THREADING_LAYER", "omp")
+
+import asyncio
+import hashlib
 import json
 import logging
+import re
+import threading
 import time
 import uuid
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, AsyncIterator
 
 import numpy as np
+import orjson
 import pandas as pd
+import torch
 import faiss
-from fastapi import FastAPI, HTTPException
+from sentence_transformers import SentenceTransformer
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from ollama import chat
+from pydantic import BaseModel, Field
+from ollama import AsyncClient
+
+try:
+    import numba
+except ImportError:  # Optional: fused matmul + top-k kernel for the exact CPU search
+    numba = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+try:
+    # OMP_NUM_THREADS may be a nested list such as "4,1"; its first field sizes the top-level pool
+    NUM_THREADS = int(os.environ["OMP_NUM_THREADS"].split(",")[0])
+    if NUM_THREADS < 1:
+        raise ValueError(f"thread count must be positive, got {NUM_THREADS}")
+except ValueError as e:
+    NUM_THREADS = _available_cpus or 1
+    logger.warning(f"Invalid OMP_NUM_THREADS={os.environ['OMP_NUM_THREADS']!r} ({e}); using {NUM_THREADS} threads.")
+torch.set_num_threads(NUM_THREADS)
+faiss.omp_set_num_threads(NUM_THREADS)
+if numba is not None:
+    # numba sizes its pool from NUMBA_NUM_THREADS (all cores by default); cap it like torch and faiss
+    numba.set_num_threads(min(NUM_THREADS, numba.config.NUMBA_NUM_THREADS))
+
 app = FastAPI(title="Real-Time Skills Extraction API")
+# JSON API routes; static assets are kept off these paths
+api = APIRouter(prefix="/api")
 
 # CORS
 app.add_middleware(
@@ -33,10 +74,61 @@ app.add_middleware(
 # Global variables
 onet_metadata = {}
 onet_skills = []
-onet_index = None
+# Per-row O*NET fields aligned with onet_skills, so search results can be gathered by index
+onet_titles = None  # Title-cased names (object array) used for deduplication
+onet_records = []  # Pre-built response dicts: name, first 5 SOC codes, uuid
+skill_embeddings = None
+onet_index = None  # FAISS HNSW index over skill_embeddings, if ONET_INDEX == "hnsw"
+fused_top_k_enabled = False  # Exact CPU search uses the Numba kernel; set by probe_fused_top_k()
+skill_matrix = None  # Torch copy of skill_embeddings on DEVICE, used on GPU or with a reduced SKILL_MATRIX_DTYPE
 model = None
+ollama_client = None
+ollama_semaphore = None
+mapping_semaphore = None
+# Content-addressed cache of normalized float32 query embeddings (LRU order)
+embedding_cache = OrderedDict()
+embedding_cache_lock = threading.Lock()
+# Exact-match cache of parsed LLM extractions: key -> (expires_at, skills), LRU order
+extraction_cache = OrderedDict()
 MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# SentenceTransformer inference backend: "torch", "onnx" or "openvino". The ONNX file can point at one
+# of the pre-exported variants on the Hub, e.g. "onnx/model_qint8_avx512_vnni.onnx" for int8 on CPU.
+EMBEDDING_BACKEND = "torch"
+EMBEDDING_MODEL_FILE = None
+# Identifies the exact encoder; cached embeddings are only reused when it matches
+EMBEDDING_ID = f"{MODEL_NAME}:{EMBEDDING_BACKEND}:{EMBEDDING_MODEL_FILE or 'default'}"
 OLLAMA_MODEL = "qwen2.5:7b"  # Can be changed to qwen2.5:3b for speed
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# O*NET search: "hnsw" (approximate, sub-linear in corpus size) or "exact" (full matmul; use it to
+# validate recall). On GPU the exact matmul is already fast, so it stays the default there.
+ONET_INDEX = "exact" if DEVICE != "cpu" else "hnsw"
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+# Storage/compute dtype of the O*NET matrix in the search matmul. "float16" / "bfloat16" halve
+# the bytes scanned per query, but the matmul returns scores rounded to that dtype; keep "float32"
+# on CPUs without native support.
+SKILL_MATRIX_DTYPE = "float32"
+# With a reduced SKILL_MATRIX_DTYPE, shortlist this many candidates per requested result and
+# re-score them in float32, so the ranking and returned scores match the float32 search
+SKILL_MATRIX_RESCORE_FACTOR = 4
+# Largest query batch searched with the fused Numba kernel; bigger batches amortise the matrix scan
+# better in the BLAS matmul, which overtakes the kernel at roughly 20-30 queries
+FUSED_TOP_K_MAX_BATCH = 16
+QUERY_MAX_LENGTH = 16  # Token cap for extracted skills; they are short phrases
+EMBEDDING_CACHE_SIZE = 100_000  # Max query-skill embeddings kept in memory
+EXTRACTION_CACHE_SIZE = 10_000  # Max LLM extraction results kept in memory
+EXTRACTION_CACHE_TTL = 30 * 24 * 3600  # Seconds before a cached extraction is recomputed
+OLLAMA_CONCURRENCY = 4  # Max in-flight Ollama requests; match OLLAMA_NUM_PARALLEL on the server
+# Max O*NET mapping jobs running in worker threads at once. Each job's encode and search already use
+# all NUM_THREADS cores, so running more than one at a time only oversubscribes the CPU.
+MAPPING_CONCURRENCY = 1
+# Serve frontend/ from this process under /static. Disable when a web server (see deploy/nginx.conf)
+# serves the frontend so uvicorn workers only handle /api.
+SERVE_FRONTEND = True
+
+# A complete JSON string literal; used to pick finished skills out of a partially streamed reply
+JSON_STRING_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"')
 
 SYSTEM_PROMPT = """
 You are an expert Skill Extraction engine.
@@ -45,25 +137,29 @@ Task:
 - Extract ONLY skills (technologies, tools, frameworks, methodologies, soft skills, hard skills) from the given text.
 - A term must be treated as a skill ONLY if it is used in a professional, technical, educational, or workplace context.
 - Ignore terms that appear in non-skill meanings such as animals, food, geography, common nouns, or everyday conversation.
-- Output list of extracted skills as shown below.
+- Output a JSON object with the list of extracted skills as shown below.
 - Output Format:
-    ["Python", "Project Management", "Machine Learning"]
+    {"skills": ["Python", "Project Management", "Machine Learning"]}
 Rules:
 - Do NOT include any explanations or extra text.
 - Do NOT include duplicates (case-insensitive).
 - Skill names should be clean, human-readable phrases.
 - If a term is ambiguous, include it ONLY when surrounding context clearly indicates it is a skill.
-- If no skills are found, return [].
+- If no skills are found, return {"skills": []}.
 """
 
 class ExtractionRequest(BaseModel):
     text: str
-    top_k: int = 2
+    top_k: int = Field(2, ge=1, le=50)
 
 @app.on_event("startup")
 async def startup_event():
-    global onet_skills, onet_index, model, onet_metadata
+    global onet_skills, onet_titles, onet_records, skill_embeddings, onet_index, skill_matrix, fused_top_k_enabled, model, onet_metadata, ollama_client, ollama_semaphore, mapping_semaphore
     
+    ollama_client = AsyncClient()
+    ollama_semaphore = asyncio.Semaphore(OLLAMA_CONCURRENCY)
+    mapping_semaphore = asyncio.Semaphore(MAPPING_CONCURRENCY)
+
     logger.info("Loading O*NET skills...")
     try:
         # Load skills from Excel files
@@ -74,33 +170,24 @@ async def startup_event():
         df_tech = pd.read_excel(tech_skills_path)
         df_skills = pd.read_excel(skills_path)
         
-        onet_metadata = {}
-
-        # Process Technology Skills
-        # using zip for performance over iterrows
-        for name, code in zip(df_tech["Example"], df_tech["O*NET-SOC Code"]):
-            if pd.isna(name): continue
-            name = str(name).strip()
-            if name not in onet_metadata:
-                onet_metadata[name] = {"soc_codes": set()}
-            onet_metadata[name]["soc_codes"].add(code)
-
-        # Process Soft Skills
-        for name, code in zip(df_skills["Element Name"], df_skills["O*NET-SOC Code"]):
-            if pd.isna(name): continue
-            name = str(name).strip()
-            if name not in onet_metadata:
-                onet_metadata[name] = {"soc_codes": set()}
-            onet_metadata[name]["soc_codes"].add(code)
-
-        # Finalize keys and metadata
+        # Group SOC codes per skill name across both sheets (first-seen name order)
+        soc_codes = group_soc_codes(pd.concat([
+            skill_code_pairs(df_tech, "Example"),
+            skill_code_pairs(df_skills, "Element Name"),
+        ], ignore_index=True))
+
+        # Finalize keys and metadata; use deterministic UUIDs based on the skill name
+        onet_metadata = {
+            name: {"soc_codes": codes, "uuid": str(uuid.uuid5(uuid.NAMESPACE_DNS, name))}
+            for name, codes in soc_codes.items()
+        }
         onet_skills = list(onet_metadata.keys())
-        
-        # Generate UUIDs and convert sets to lists
-        for name in onet_skills:
-            onet_metadata[name]["soc_codes"] = list(onet_metadata[name]["soc_codes"])
-            # Use deterministic UUID based on the skill name
-            onet_metadata[name]["uuid"] = str(uuid.uuid5(uuid.NAMESPACE_DNS, name))
+        onet_titles = np.array([name.title() for name in onet_skills], dtype=object)
+        # Limit SOC codes to first 5
+        onet_records = [
+            {"name": title, "soc_codes": onet_metadata[name]["soc_codes"][:5], "uuid": onet_metadata[name]["uuid"]}
+            for name, title in zip(onet_skills, onet_titles)
+        ]
 
         logger.info(f"Loaded {len(onet_skills)} O*NET skills.")
         
@@ -110,114 +197,520 @@ async def startup_event():
 
     logger.info("Loading SentenceTransformer model...")
     try:
-        model = SentenceTransformer(MODEL_NAME)
-        logger.info("SentenceTransformer model loaded.")
+        model_kwargs = {"file_name": EMBEDDING_MODEL_FILE} if EMBEDDING_MODEL_FILE else None
+        model = SentenceTransformer(
+            MODEL_NAME, device=DEVICE, backend=EMBEDDING_BACKEND, model_kwargs=model_kwargs
+        )
+        logger.info(f"SentenceTransformer model loaded ({EMBEDDING_BACKEND} backend on {DEVICE}).")
     except Exception as e:
         logger.error(f"Error loading SentenceTransformer: {e}")
         raise e
 
-    logger.info("Creating FAISS index...")
+    logger.info("Building O*NET embedding matrix...")
     try:
-        # Create index dynamically
         if not onet_skills:
             raise ValueError("No O*NET skills loaded to index.")
-            
-        skill_embeddings = model.encode(onet_skills, show_progress_bar=True, convert_to_numpy=True)
-        skill_embeddings = skill_embeddings / np.linalg.norm(skill_embeddings, axis=1, keepdims=True)
-        dim = skill_embeddings.shape[1]
-        
-        onet_index = faiss.IndexFlatIP(dim)
-        onet_index.add(skill_embeddings)
+
+        cache_dir = os.path.join(base_path, "cache")
+        matrix_path = os.path.join(cache_dir, "onet_skills.f32.npy")
+        digest_path = os.path.join(cache_dir, "onet_skills.f32.sha256")
+        digest = onet_embeddings_digest(onet_skills)
+
+        cached_digest = None
+        if os.path.exists(matrix_path) and os.path.exists(digest_path):
+            with open(digest_path) as f:
+                cached_digest = f.read().strip()
+
+        if cached_digest == digest:
+            # Read-only memory map: no re-encoding, and pages are shared across forked workers
+            skill_embeddings = np.load(matrix_path, mmap_mode="r")
+            logger.info(f"Loaded cached O*NET embeddings from {matrix_path}.")
+        else:
+            embeddings = model.encode(
+                onet_skills, show_progress_bar=True, convert_to_numpy=True, normalize_embeddings=True
+            )
+            # Contiguous float32 rows so the query matmul goes straight to BLAS SGEMM
+            skill_embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            save_onet_embeddings(skill_embeddings, digest, matrix_path, digest_path)
+
+        if ONET_INDEX not in ("hnsw", "exact"):
+            raise ValueError(f"Unsupported ONET_INDEX: {ONET_INDEX}")
+        if SKILL_MATRIX_DTYPE not in ("float32", "float16", "bfloat16"):
+            raise ValueError(f"Unsupported SKILL_MATRIX_DTYPE: {SKILL_MATRIX_DTYPE}")
+        if ONET_INDEX == "hnsw":
+            if SKILL_MATRIX_DTYPE != "float32":
+                logger.warning(
+                    f"SKILL_MATRIX_DTYPE={SKILL_MATRIX_DTYPE} only applies with ONET_INDEX=\"exact\"; "
+                    "the HNSW index searches float32 vectors."
+                )
+            index_name = f"onet_skills.hnsw{HNSW_M}-{HNSW_EF_CONSTRUCTION}.{digest[:16]}.faiss"
+            onet_index = load_or_build_hnsw_index(skill_embeddings, os.path.join(cache_dir, index_name))
+        elif DEVICE != "cpu" or SKILL_MATRIX_DTYPE != "float32":
+            # Keep the matrix resident on the device; only the small query batch is copied per request
+            skill_matrix = torch.from_numpy(np.array(skill_embeddings)).to(
+                device=DEVICE, dtype=getattr(torch, SKILL_MATRIX_DTYPE)
+            )
         
-        logger.info(f"FAISS index created with {onet_index.ntotal} vectors.")
+        logger.info(f"Embedding matrix ready with shape {skill_embeddings.shape}.")
         
     except Exception as e:
-        logger.error(f"Error creating FAISS index: {e}")
+        logger.error(f"Error building embedding matrix: {e}")
         raise e
 
-def normalize(v):
-    return v / np.linalg.norm(v, keepdims=True)
+    if numba is not None and onet_index is None and skill_matrix is None:
+        fused_top_k_enabled = probe_fused_top_k()
+
+    # Pay one-off costs (kernel selection, thread-pool start-up, allocator growth) before the first request
+    logger.info("Warming up encoder and search...")
+    encode_queries(["warmup"] * 8)
+    search_top_k(np.zeros((1, skill_embeddings.shape[1]), dtype=np.float32), 2)
+
+def skill_code_pairs(df: pd.DataFrame, name_column: str) -> pd.DataFrame:
+    df = df.dropna(subset=[name_column])
+    return pd.DataFrame({
+        "name": df[name_column].astype(str).str.strip(),
+        "code": df["O*NET-SOC Code"],
+    })
+
+def group_soc_codes(pairs: pd.DataFrame) -> Dict[str, List[str]]:
+    """Map each skill name to its unique SOC codes, keeping names in first-seen order."""
+    pairs = pairs.drop_duplicates()
+    group_ids, names = pd.factorize(pairs["name"], sort=False)
+    # Stable sort by group, then cut the code column at group boundaries
+    order = np.argsort(group_ids, kind="stable")
+    bounds = np.cumsum(np.bincount(group_ids, minlength=len(names)))[:-1]
+    groups = np.split(pairs["code"].to_numpy()[order], bounds)
+    return {name: codes.tolist() for name, codes in zip(names, groups)}
+
+def onet_embeddings_digest(skills: List[str]) -> str:
+    """Fingerprint of the skill list and encoder, used to validate the on-disk embedding cache."""
+    h = hashlib.sha256(EMBEDDING_ID.encode("utf-8"))
+    for name in skills:
+        h.update(b"\x00")
+        h.update(name.encode("utf-8"))
+    return h.hexdigest()
+
+def save_onet_embeddings(embeddings: np.ndarray, digest: str, matrix_path: str, digest_path: str):
+    try:
+        os.makedirs(os.path.dirname(matrix_path), exist_ok=True)
+        # Write to temp files and rename so concurrent workers never see a partial cache
+        tmp_matrix = f"{matrix_path}.{os.getpid()}.tmp"
+        with open(tmp_matrix, "wb") as f:
+            np.save(f, embeddings)
+        os.replace(tmp_matrix, matrix_path)
+        tmp_digest = f"{digest_path}.{os.getpid()}.tmp"
+        with open(tmp_digest, "w") as f:
+            f.write(digest)
+        os.replace(tmp_digest, digest_path)
+        logger.info(f"Saved O*NET embeddings to {matrix_path}.")
+    except OSError as e:
+        # The cache is an optimization only; keep serving with the in-memory matrix
+        logger.warning(f"Could not save O*NET embedding cache: {e}")
+
+def load_or_build_hnsw_index(embeddings: np.ndarray, index_path: str):
+    if os.path.exists(index_path):
+        index = faiss.read_index(index_path)
+        logger.info(f"Loaded cached HNSW index from {index_path}.")
+        return index
+
+    index = faiss.IndexHNSWFlat(embeddings.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+    logger.info(f"HNSW index created with {index.ntotal} vectors.")
+    try:
+        # The file name carries the embedding digest, so a stale index is never picked up
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        faiss.write_index(index, tmp_path)
+        os.replace(tmp_path, index_path)
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Could not save HNSW index: {e}")
+    return index
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def fused_top_k(queries, mat, k, n_blocks):
+        """Top-k of queries @ mat.T per query, without materializing the (B, N) score matrix.
+
+        Queries are split into n_blocks blocks (one per thread); each block streams the matrix once, reusing
+        every row for all of its queries, and keeps a descending insertion-sorted buffer per query.
+        """
+        b = queries.shape[0]
+        n, d = mat.shape
+        out_scores = np.full((b, k), -np.inf, dtype=np.float32)
+        out_idx = np.full((b, k), -1, dtype=np.int64)
+        for block in numba.prange(n_blocks):
+            for j in range(n):
+                row = mat[j]
+                for qi in range(block * b // n_blocks, (block + 1) * b // n_blocks):
+                    q = queries[qi]
+                    score = np.float32(0.0)
+                    for t in range(d):
+                        score += q[t] * row[t]
+                    best_scores = out_scores[qi]
+                    if score > best_scores[k - 1]:
+                        best_idx = out_idx[qi]
+                        pos = k - 1
+                        while pos > 0 and best_scores[pos - 1] < score:
+                            best_scores[pos] = best_scores[pos - 1]
+                            best_idx[pos] = best_idx[pos - 1]
+                            pos -= 1
+                        best_scores[pos] = score
+                        best_idx[pos] = j
+        return out_scores, out_idx
+
+def probe_fused_top_k() -> bool:
+    """Enable the fused kernel only on Numba's thread-safe OpenMP layer, checking before any launch."""
+    layer = numba.config.THREADING_LAYER
+    if layer != "omp":
+        # Don't launch it to find out: a first TBB launch off the main thread can hang
+        logger.warning(f"Numba threading layer is {layer!r}, not 'omp'; using NumPy search.")
+        return False
+    try:
+        fused_top_k(np.zeros((1, 1), dtype=np.float32), np.zeros((1, 1), dtype=np.float32), 1, 1)
+    except ValueError as e:
+        logger.warning(f"Numba OpenMP threading layer unavailable, using NumPy search: {e}")
+        return False
+    return True
+
+def search_top_k(query_emb: np.ndarray, k: int):
+    """Inner-product search of normalized queries against the O*NET matrix.
+
+    Returns (scores, indices), each of shape (len(query_emb), k), best match first.
+    The HNSW index may pad a row with index -1 if it finds fewer than k neighbours.
+    """
+    k = min(k, skill_embeddings.shape[0])
+    if onet_index is not None:
+        params = faiss.SearchParametersHNSW(efSearch=max(HNSW_EF_SEARCH, k))
+        return onet_index.search(query_emb, k, params=params)
+
+    if skill_matrix is not None:
+        query = torch.from_numpy(query_emb).to(device=skill_matrix.device, dtype=skill_matrix.dtype)
+        scores = torch.matmul(query, skill_matrix.T)
+        if skill_matrix.dtype == torch.float32:
+            top_scores, top = torch.topk(scores, k, dim=1)
+            return top_scores.cpu().numpy(), top.cpu().numpy()
+        n_candidates = min(SKILL_MATRIX_RESCORE_FACTOR * k, skill_embeddings.shape[0])
+        candidates = torch.topk(scores, n_candidates, dim=1).indices.cpu().numpy()
+        exact = np.einsum("bd,bcd->bc", query_emb, skill_embeddings[candidates])
+        order = np.argsort(-exact, axis=1)[:, :k]
+        return np.take_along_axis(exact, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+    if fused_top_k_enabled and 0 < k and len(query_emb) <= FUSED_TOP_K_MAX_BATCH:
+        n_blocks = min(len(query_emb), NUM_THREADS, numba.config.NUMBA_NUM_THREADS)
+        # The thread count is thread-local, so set it on the worker thread that launches the kernel
+        numba.set_num_threads(n_blocks)
+        return fused_top_k(np.ascontiguousarray(query_emb, dtype=np.float32), skill_embeddings, k, n_blocks)
+
+    scores = query_emb @ skill_embeddings.T
+    if k < scores.shape[1]:
+        top = np.argpartition(-scores, k, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+
+def embedding_cache_key(text: str) -> str:
+    # The model is uncased, so case and surrounding whitespace don't change the embedding
+    payload = f"{EMBEDDING_ID}\x00{text.lower().strip()}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def encode_queries(texts: List[str]) -> np.ndarray:
+    """Encode short skill phrases with one tokenizer call and one forward pass.
 
-def retrieve_top_k_skills(index, text, skills, k=50):
-    query_emb = model.encode([text], convert_to_numpy=True)
-    query_emb = normalize(query_emb)
-    scores, indices = index.search(query_emb, k)
-    indices = indices[0]
-    scores = scores[0]
+    Bypasses SentenceTransformer.encode's length sorting and per-mini-batch padding, which dominate
+    for inputs of a few tokens, and caps the padded length at QUERY_MAX_LENGTH.
+    """
+    features = model.tokenizer(
+        texts, padding="longest", truncation=True, max_length=QUERY_MAX_LENGTH, return_tensors="pt"
+    )
+    features = {name: tensor.to(model.device) for name, tensor in features.items()}
+    with torch.inference_mode():
+        embeddings = model(features)["sentence_embedding"]
+    embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+    return embeddings.float().cpu().numpy()
 
-    results = [(skills[i], float(scores[j])) for j, i in enumerate(indices)]
-    return results
+def get_or_compute_many(texts: List[str]) -> np.ndarray:
+    """Return a (len(texts), dim) matrix of embeddings, encoding only cache misses."""
+    keys = [embedding_cache_key(t) for t in texts]
+    found = {}
+    with embedding_cache_lock:
+        for key in keys:
+            if key in embedding_cache:
+                embedding_cache.move_to_end(key)
+                found[key] = embedding_cache[key]
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in missing:
+            missing[key] = text
+    if missing:
+        computed = encode_queries(list(missing.values()))
+        with embedding_cache_lock:
+            for key, emb in zip(missing, computed):
+                # Own the row so a cached entry doesn't keep the whole batch buffer alive
+                emb = emb.copy()
+                found[key] = emb
+                embedding_cache[key] = emb
+                embedding_cache.move_to_end(key)
+            while len(embedding_cache) > EMBEDDING_CACHE_SIZE:
+                embedding_cache.popitem(last=False)
+
+    return np.stack([found[key] for key in keys])
+
+def map_skills(extracted_skills: List[str], top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Map extracted skills to their top-k O*NET matches (one batched encode of cache misses + one matmul search)."""
+    skill_mapping = {}
+    if not extracted_skills:
+        return skill_mapping
+
+    query_emb = get_or_compute_many(extracted_skills)
+    scores, indices = search_top_k(query_emb, top_k)
+
+    titles = onet_titles[indices]
+    for skill, row_titles, row_indices, row_scores in zip(extracted_skills, titles, indices, scores):
+        valid = row_indices >= 0
+        row_titles, row_indices, row_scores = row_titles[valid], row_indices[valid], row_scores[valid]
+        # Deduplicate on title-cased name, keeping the best-scoring (first) occurrence in rank order
+        _, first = np.unique(row_titles, return_index=True)
+        keep = np.sort(first)
+        skill_mapping[skill] = [
+            {**onet_records[i], "score": score}
+            for i, score in zip(row_indices[keep].tolist(), row_scores[keep].tolist())
+        ]
+    return skill_mapping
+
+def extraction_cache_key(text: str) -> str:
+    payload = f"{OLLAMA_MODEL}\x00{SYSTEM_PROMPT}\x00{text.strip()}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def get_cached_extraction(key: str):
+    entry = extraction_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, skills = entry
+    if expires_at < time.time():
+        del extraction_cache[key]
+        return None
+    extraction_cache.move_to_end(key)
+    return list(skills)
+
+def put_cached_extraction(key: str, skills: List[str]):
+    extraction_cache[key] = (time.time() + EXTRACTION_CACHE_TTL, list(skills))
+    extraction_cache.move_to_end(key)
+    while len(extraction_cache) > EXTRACTION_CACHE_SIZE:
+        extraction_cache.popitem(last=False)
+
+async def extract_skills_ollama(text: str) -> List[str]:
+    # Identical texts are common (debounced typing, demos), so reuse earlier LLM output
+    cache_key = extraction_cache_key(text)
+    cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        return cached
 
-def extract_skills_ollama(text: str) -> List[str]:
     try:
-        response = chat(model=OLLAMA_MODEL, messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": text}
-        ])
-        content = response.message.content
-        # Clean up code blocks if present
-        content = content.replace("```json", "").replace("```", "").strip()
-        extracted_skills = ast.literal_eval(content)
-        if not isinstance(extracted_skills, list):
-            logger.warning(f"Ollama returned non-list: {extracted_skills}")
-            return []
+        # Bound the number of concurrent LLM calls so Ollama isn't flooded
+        async with ollama_semaphore:
+            # JSON mode constrains the output to valid JSON, so no code fences to strip
+            response = await ollama_client.chat(model=OLLAMA_MODEL, format="json", messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": text}
+            ])
+        extracted_skills = parse_skills_reply(response.message.content)
+        # Only successful parses are cached so transient failures get retried
+        put_cached_extraction(cache_key, extracted_skills)
         return extracted_skills
     except Exception as e:
         logger.error(f"Error in Ollama extraction: {e}")
         return []
 
-@app.post("/extract")
+def parse_streamed_skills(content: str) -> List[str]:
+    """Return the complete top-level strings of the "skills" array in a partial {"skills": [...]} reply.
+
+    Strings in other keys or nested inside array elements are skipped, and scanning stops at the
+    array's closing bracket.
+    """
+    skills = []
+    depth = 0
+    key = None  # Most recent key read in the top-level object
+    expect_key = False
+    in_skills = False
+    i = 0
+    while i < len(content):
+        ch = content[i]
+        if ch == '"':
+            match = JSON_STRING_PATTERN.match(content, i)
+            if match is None:
+                break  # String still being generated
+            value = json.loads(match.group(0), strict=False)
+            if in_skills and depth == 2:
+                skills.append(value)
+            elif depth == 1 and expect_key:
+                key = value
+                expect_key = False
+            i = match.end()
+            continue
+        if ch in "{[":
+            depth += 1
+            if depth == 1:
+                expect_key = True
+            elif depth == 2 and ch == "[" and key == "skills":
+                in_skills = True
+        elif ch in "}]":
+            if in_skills and depth == 2:
+                break
+            depth -= 1
+        elif ch == "," and depth == 1:
+            expect_key = True
+        i += 1
+    return skills
+
+def parse_skills_reply(content: str) -> List[str]:
+    """Parse a complete {"skills": [...]} reply, keeping only its string elements."""
+    extracted_skills = json.loads(content)["skills"]
+    if not isinstance(extracted_skills, list):
+        raise ValueError(f"Ollama returned non-list: {extracted_skills}")
+    return [skill for skill in extracted_skills if isinstance(skill, str)]
+
+async def stream_skills_ollama(text: str, parsed: List[str]) -> AsyncIterator[List[str]]:
+    """Yield batches of extracted skills as soon as the LLM has finished generating them.
+
+    Each batch holds the skills completed by one streamed chunk; a cached reply is a single batch.
+
+    Once the reply is complete, `parsed` is filled with the skill list parsed from the whole reply.
+    """
+    cache_key = extraction_cache_key(text)
+    cached = get_cached_extraction(cache_key)
+    if cached is not None:
+        parsed.extend(cached)
+        if cached:
+            yield cached
+        return
+
+    content = ""
+    skills = []
+    try:
+        async with ollama_semaphore:
+            stream = await ollama_client.chat(model=OLLAMA_MODEL, format="json", stream=True, messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": text}
+            ])
+            async for chunk in stream:
+                content += chunk.message.content
+                emitted = len(skills)
+                skills = parse_streamed_skills(content)
+                if len(skills) > emitted:
+                    yield skills[emitted:]
+        extracted_skills = parse_skills_reply(content)
+    except Exception as e:
+        # e.g. a reply cut off by num_predict: report the skills already streamed, but don't cache them
+        logger.error(f"Error in Ollama extraction: {e}")
+        parsed.extend(skills)
+        return
+
+    put_cached_extraction(cache_key, extracted_skills)
+    parsed.extend(extracted_skills)
+    # The incremental parser only sees complete strings; emit anything it could not
+    if len(extracted_skills) > len(skills):
+        yield extracted_skills[len(skills):]
+
+async def map_skills_bounded(extracted_skills: List[str], top_k: int) -> Dict[str, List[Dict[str, Any]]]:
+    # CPU-bound, so keep it off the event loop; the semaphore avoids oversubscribing the cores
+    async with mapping_semaphore:
+        return await asyncio.to_thread(map_skills, extracted_skills, top_k)
+
+@api.post("/extract")
 async def extract_endpoint(request: ExtractionRequest):
     start_time = time.time()
     
     # 1. Extract skills using Ollama
-    extracted_skills = extract_skills_ollama(request.text)
+    extracted_skills = await extract_skills_ollama(request.text)
     
     # 2. Map to O*NET skills
-    skill_mapping = {}
-    for skill in extracted_skills:
-        related = retrieve_top_k_skills(onet_index, skill, onet_skills, k=request.top_k)
-        # Format for JSON response
-        formatted_related = []
-        skills_added = set()
-        for name, score in related:
-            meta = onet_metadata.get(name, {})
-            # Limit SOC codes to first 5, join by comma for display if needed, or send as list
-            soc_codes_list = meta.get("soc_codes", [])
-            uuid_val = meta.get("uuid", "")
-            
-            # Deduplicate based on title-cased name
-            normalized_name = name.title()
-            if normalized_name not in skills_added:
-                skills_added.add(normalized_name)
-                formatted_related.append({
-                    "name": normalized_name, 
-                    "score": score,
-                    "soc_codes": soc_codes_list[:5],
-                    "uuid": uuid_val
-                })
-        skill_mapping[skill] = formatted_related
-        
+    skill_mapping = await map_skills_bounded(extracted_skills, request.top_k)
+
     execution_time = time.time() - start_time
     
-    return {
+    # Serialize directly with orjson; the payload is already plain JSON types
+    return Response(orjson.dumps({
         "extracted_skills": extracted_skills,
         "mapped_skills": skill_mapping,
         "execution_time": execution_time
-    }
+    }), media_type="application/json")
 
-# Mount backend to /api if needed, or just let specific routes handle it.
-# Mount frontend StaticFiles to root
-# app.mount("/", StaticFiles(directory="../frontend", html=True), name="static") will be added at the end
-# But first, remove the old root endpoint so it doesn't conflict or just rename it.
+@api.post("/extract/stream")
+async def extract_stream_endpoint(request: ExtractionRequest):
+    """NDJSON stream: one {"skill", "mapped_skills"} line per skill as it is mapped,
+    then a final {"extracted_skills", "execution_time"} line, which also carries "error" if mapping failed.
+
+    Skills are mapped as soon as the LLM emits them, overlapping mapping with decoding; all skills
+    completed by the same chunk are mapped together in one batched encode + search.
+    """
+    start_time = time.time()
+    results = asyncio.Queue()
+    # Filled from the complete parsed reply; the summary line reports this, not the streamed lines
+    extracted_skills = []
 
+    async def map_batch(skills: List[str]):
+        mapping = await map_skills_bounded(skills, request.top_k)
+        for skill in skills:
+            results.put_nowait({"skill": skill, "mapped_skills": mapping[skill]})
 
-@app.get("/health")
+    async def produce():
+        tasks = []
+        try:
+            async for batch in stream_skills_ollama(request.text, extracted_skills):
+                tasks.append(asyncio.create_task(map_batch(batch)))
+            await asyncio.gather(*tasks)
+        finally:
+            # Don't leave mapping tasks behind if the stream was cancelled or failed
+            for task in tasks:
+                task.cancel()
+            results.put_nowait(None)
+
+    async def generate():
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await results.get()) is not None:
+                yield orjson.dumps(item) + b"\n"
+            summary = {"extracted_skills": extracted_skills}
+            try:
+                await producer
+            except Exception as e:
+                # The 200 status is already sent, so report the failure in the summary line instead
+                logger.error(f"Error in streamed extraction: {e}")
+                summary["error"] = "Skill mapping failed"
+            summary["execution_time"] = time.time() - start_time
+            yield orjson.dumps(summary) + b"\n"
+        finally:
+            # Stop pulling from the LLM if the client went away
+            producer.cancel()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@api.get("/health")
 def health_check():
     return {"status": "ok", "model": OLLAMA_MODEL}
 
-# Mount frontend
-# Note: We use an absolute path or relative to main.py to be safe, but ".." assumes CWD or file relation
-import os
-frontend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
-app.mount("/", StaticFiles(directory=frontend_path, html=True), name="static")
+app.include_router(api)
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with Cache-Control headers so browsers don't re-request unchanged assets."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        if response.media_type == "text/html":
+            response.headers["Cache-Control"] = "no-cache"
+        else:
+            # Assets are referenced with a ?v= version query, so they can be cached aggressively
+            response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
+
+if SERVE_FRONTEND:
+    # Note: We use a path relative to main.py so it works regardless of the CWD
+    frontend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
+    app.mount("/static", CachedStaticFiles(directory=frontend_path, html=True), name="static")
+
+    @app.get("/", include_in_schema=False)
+    def index():
+        return RedirectResponse("/static/")
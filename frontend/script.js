@@ -44,7 +44,7 @@ document.addEventListener('DOMContentLoaded', () => {
         setLoading(true);
 
         try {
-            const response = await fetch(`${API_URL}/extract`, {
+            const response = await fetch(`${API_URL}/api/extract/stream`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -57,11 +57,33 @@ document.addEventListener('DOMContentLoaded', () => {
                 throw new Error(`Error: ${response.statusText}`);
             }
 
-            const data = await response.json();
-            currentSkills = data.extracted_skills;
-
+            // NDJSON: one line per mapped skill, then a final summary line
+            resultsSection.innerHTML = '';
+            statsDiv.textContent = '';
+            currentSkills = [];
 
-            renderResults(data);
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+
+                lines.filter(line => line.trim()).forEach(line => {
+                    const data = JSON.parse(line);
+                    if (data.skill !== undefined) {
+                        currentSkills.push(data.skill);
+                        renderSkill(data.skill, data.mapped_skills);
+                    } else {
+                        renderStats(data);
+                    }
+                });
+            }
 
         } catch (error) {
             if (error.name === 'AbortError') {
@@ -86,84 +108,76 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function renderResults(data) {
-        const { extracted_skills, mapped_skills, execution_time } = data;
-
-        // Update stats
-        statsDiv.textContent = `Found ${extracted_skills.length} skills in ${execution_time.toFixed(2)}s`;
-
-        resultsSection.innerHTML = '';
+    function renderStats(data) {
+        const { extracted_skills, execution_time, error } = data;
+        statsDiv.textContent = `Found ${extracted_skills.length} skills in ${execution_time.toFixed(2)}s`
+            + (error ? ` (${error})` : '');
+    }
 
-        if (extracted_skills.length === 0) {
-            return;
+    function renderSkill(skill, related) {
+        const card = document.createElement('div');
+        card.className = 'skill-card';
+
+        const header = document.createElement('div');
+        header.className = 'extracted-skill';
+        header.textContent = skill;
+        card.appendChild(header);
+
+        const mappedContainer = document.createElement('div');
+        mappedContainer.className = 'mapped-skills';
+
+        if (related && related.length > 0) {
+            related.forEach(item => {
+                const row = document.createElement('div');
+                row.className = 'mapped-item';
+
+                // Header row with Name and Score
+                const headerRow = document.createElement('div');
+                headerRow.style.display = 'flex';
+                headerRow.style.justifyContent = 'space-between';
+                headerRow.style.alignItems = 'center';
+
+                const name = document.createElement('span');
+                name.className = 'mapped-name';
+                name.textContent = item.name;
+
+                const score = document.createElement('span');
+                score.className = 'mapped-score';
+                score.textContent = `${(item.score * 100).toFixed(0)}%`;
+
+                headerRow.appendChild(name);
+                headerRow.appendChild(score);
+                row.appendChild(headerRow);
+
+                // Details row with SOC and UUID
+                const detailsDiv = document.createElement('div');
+                detailsDiv.style.fontSize = '0.8rem';
+                detailsDiv.style.color = '#666';
+                detailsDiv.style.marginTop = '4px';
+
+                if (item.soc_codes && item.soc_codes.length > 0) {
+                    const socDiv = document.createElement('div');
+                    socDiv.innerHTML = `<strong>SOC:</strong> ${item.soc_codes.join(', ')}`;
+                    detailsDiv.appendChild(socDiv);
+                }
+
+                if (item.uuid) {
+                    const uuidDiv = document.createElement('div');
+                    uuidDiv.innerHTML = `<strong>UUID:</strong> <span style="font-family: monospace;">${item.uuid}</span>`;
+                    detailsDiv.appendChild(uuidDiv);
+                }
+
+                row.appendChild(detailsDiv);
+                mappedContainer.appendChild(row);
+            });
+        } else {
+            const empty = document.createElement('div');
+            empty.className = 'mapped-item';
+            empty.textContent = 'No O*NET match found';
+            mappedContainer.appendChild(empty);
         }
 
-        extracted_skills.forEach(skill => {
-            const card = document.createElement('div');
-            card.className = 'skill-card';
-
-            const header = document.createElement('div');
-            header.className = 'extracted-skill';
-            header.textContent = skill;
-            card.appendChild(header);
-
-            const mappedContainer = document.createElement('div');
-            mappedContainer.className = 'mapped-skills';
-
-            const related = mapped_skills[skill] || [];
-            if (related.length > 0) {
-                related.forEach(item => {
-                    const row = document.createElement('div');
-                    row.className = 'mapped-item';
-
-                    // Header row with Name and Score
-                    const headerRow = document.createElement('div');
-                    headerRow.style.display = 'flex';
-                    headerRow.style.justifyContent = 'space-between';
-                    headerRow.style.alignItems = 'center';
-
-                    const name = document.createElement('span');
-                    name.className = 'mapped-name';
-                    name.textContent = item.name;
-
-                    const score = document.createElement('span');
-                    score.className = 'mapped-score';
-                    score.textContent = `${(item.score * 100).toFixed(0)}%`;
-
-                    headerRow.appendChild(name);
-                    headerRow.appendChild(score);
-                    row.appendChild(headerRow);
-
-                    // Details row with SOC and UUID
-                    const detailsDiv = document.createElement('div');
-                    detailsDiv.style.fontSize = '0.8rem';
-                    detailsDiv.style.color = '#666';
-                    detailsDiv.style.marginTop = '4px';
-
-                    if (item.soc_codes && item.soc_codes.length > 0) {
-                        const socDiv = document.createElement('div');
-                        socDiv.innerHTML = `<strong>SOC:</strong> ${item.soc_codes.join(', ')}`;
-                        detailsDiv.appendChild(socDiv);
-                    }
-
-                    if (item.uuid) {
-                        const uuidDiv = document.createElement('div');
-                        uuidDiv.innerHTML = `<strong>UUID:</strong> <span style="font-family: monospace;">${item.uuid}</span>`;
-                        detailsDiv.appendChild(uuidDiv);
-                    }
-
-                    row.appendChild(detailsDiv);
-                    mappedContainer.appendChild(row);
-                });
-            } else {
-                const empty = document.createElement('div');
-                empty.className = 'mapped-item';
-                empty.textContent = 'No O*NET match found';
-                mappedContainer.appendChild(empty);
-            }
-
-            card.appendChild(mappedContainer);
-            resultsSection.appendChild(card);
-        });
+        card.appendChild(mappedContainer);
+        resultsSection.appendChild(card);
     }
 });
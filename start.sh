@@ -14,5 +14,5 @@ cd backend
 pip install -q -r requirements.txt
 
 # Start Backend in background
-echo "Starting Backend on port 8001..."
+echo "Starting Backend on port 8001 (open http://localhost:8001/)..."
 uvicorn main:app --reload --host 0.0.0.0 --port 8001